@@ -1,12 +1,22 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-from flask import send_from_directory, abort
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, session, g
+from flask import send_from_directory, abort, jsonify, make_response, Request, Response
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.ext.mutable import MutableDict
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+import collections
 import datetime
+import functools
+import hashlib
+import itertools
 import os
+import re
+import shutil
+import tempfile
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 
 ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME')
@@ -55,7 +65,14 @@ app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = _get_database_uri()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+# Behind nginx/Apache, let the web server sendfile() media instead of Python
+app.config['USE_X_SENDFILE'] = bool(os.environ.get('USE_XSENDFILE'))
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    # keep a small pool of warm psycopg connections per worker; the engine
+    # only opens them on first checkout, so cold starts don't pay for it
+    "pool_size": 5,
+    "max_overflow": 5,
+    "pool_recycle": 1800,
     "pool_pre_ping": True,
 }
 app.config['SQLALCHEMY_SESSION_OPTIONS'] = {
@@ -63,23 +80,57 @@ app.config['SQLALCHEMY_SESSION_OPTIONS'] = {
 }
 db = SQLAlchemy(app)
 app.logger.setLevel(logging.INFO)
-app.jinja_env.globals['current_year'] = lambda: datetime.datetime.utcnow().year
+
+
+# The footer year only changes at midnight, so resolve it once per day
+# rather than on every render. Jinja already caches the compiled templates.
+_year_cache = [0.0, 0]  # [local midnight that ends the cached day, year]
+
+
+def _current_year() -> int:
+    if time.time() >= _year_cache[0]:
+        today = datetime.date.today()
+        next_midnight = time.mktime((today + datetime.timedelta(days=1)).timetuple())
+        _year_cache[:] = [next_midnight, today.year]
+    return _year_cache[1]
+
+
+app.jinja_env.globals['current_year'] = _current_year
 try:
 	app_requests = __import__("requests")
 except Exception:
 	app_requests = None
 
 # Gallery configuration
-ALLOWED_MEDIA_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp4', 'mov', 'avi'}
+ALLOWED_MEDIA_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp4', 'mov', 'avi'})
 GALLERY_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+MEDIA_MAX_AGE = 31536000  # one year; media URLs are versioned
 
 def allowed_media_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_MEDIA_EXTENSIONS
+    # hot in directory/blob listings: one rfind and one set lookup
+    dot = filename.rfind('.')
+    return dot != -1 and filename[dot + 1:].lower() in ALLOWED_MEDIA_EXTENSIONS
  
+GALLERY_YEARS = frozenset({2025, 2026})
+
+
+def _parse_year(src, default=2025):
+    """Read 'year' from request args/form, falling back to default if unknown."""
+    try:
+        year = int(src.get('year', default))
+    except (TypeError, ValueError):
+        return default
+    return year if year in GALLERY_YEARS else default
+
+
+# Years are validated against GALLERY_YEARS before use, so resolve each
+# folder once rather than joining paths on every request.
+GALLERY_YEAR_DIRS = {year: os.path.join(GALLERY_ROOT, str(year)) for year in GALLERY_YEARS}
+
 # Try to ensure gallery year folders exist (ignore errors on read-only FS)
-for _year in ('2025', '2026'):
+for _year_dir in GALLERY_YEAR_DIRS.values():
     try:
-        os.makedirs(os.path.join(GALLERY_ROOT, _year), exist_ok=True)
+        os.makedirs(_year_dir, exist_ok=True)
     except OSError:
         pass
 
@@ -91,14 +142,77 @@ for _year in ('2025', '2026'):
 # Notes: We list blobs by prefix "{BLOB_PREFIX}/{year}/" and use returned 'url' to render.
 VERCEL_BLOB_READ_TOKEN = os.environ.get('BLOB_READ_TOKEN')
 BLOB_PREFIX = os.environ.get('BLOB_PREFIX', 'images')
+BLOB_LIST_TTL = 60.0  # seconds; bounds how stale this process's listing can be
+
+# Reuse one keep-alive session so repeat listings skip the TLS handshake.
+_blob_session = None
+if app_requests is not None:
+    _blob_session = app_requests.Session()
+    _blob_session.mount(
+        "https://",
+        app_requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8),
+    )
 
-def _list_vercel_blobs_for_year(year: int):
-    """Return list of dicts: {name, url, uploaded_at} for files under prefix."""
-    if not VERCEL_BLOB_READ_TOKEN or app_requests is None:
-        return []
+# year -> (monotonic fetch time, listing, {name: url})
+_blob_list_cache = {}
+
+# Background threads for blob listings so they overlap with request work.
+_io_pool = ThreadPoolExecutor(max_workers=4)
+
+
+# One gallery entry as the template sees it; v is the cache-busting version.
+# A namedtuple keeps large listings far lighter than a dict per item.
+MediaItem = collections.namedtuple('MediaItem', 'name v url', defaults=(None,))
+
+
+def _parse_iso8601(value):
+    """Epoch seconds for an ISO 8601 timestamp like '2025-03-01T10:00:00.000Z', else None."""
+    if not isinstance(value, str) or not value:
+        return None
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        return int(datetime.datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+
+def _invalidate_blob_listing(year: int):
+    """Make this process re-read ``year``'s blob listing on its next request.
+
+    Uploads and deletes only touch the local gallery folders, never Vercel
+    Blob, so this doesn't publish an edit; it just skips the rest of the TTL.
+    """
+    _blob_list_cache.pop(year, None)
+
+
+# year -> Future of an in-flight background refresh
+_blob_refreshes = {}
+
+
+def _blob_listing(year: int):
+    """Return ([MediaItem], {name: url}) for a year, served from cache while fresh."""
+    if not VERCEL_BLOB_READ_TOKEN or _blob_session is None:
+        return [], {}
+    cached = _blob_list_cache.get(year)
+    if cached and time.monotonic() - cached[0] < BLOB_LIST_TTL:
+        return cached[1], cached[2]
+    # join a background fetch already under way rather than issuing another
+    pending = _blob_refreshes.get(year)
+    if pending is not None and not pending.done():
+        try:
+            return pending.result(timeout=10)
+        except Exception:
+            pass
+    return _fetch_blob_listing(year)
+
+
+def _fetch_blob_listing(year: int):
+    """Fetch a year's listing from the Blob API and cache it."""
+    now = time.monotonic()
     prefix = f"{BLOB_PREFIX}/{year}/"
     try:
-        resp = app_requests.get(
+        resp = _blob_session.get(
             "https://api.vercel.com/v2/blob",
             params={"limit": 1000, "prefix": prefix},
             headers={"Authorization": f"Bearer {VERCEL_BLOB_READ_TOKEN}"},
@@ -108,6 +222,8 @@ def _list_vercel_blobs_for_year(year: int):
         data = resp.json()
         items = data.get("blobs", []) or data.get("items", []) or []
         results = []
+        index = {}
+        fetched_at = int(time.time())
         for it in items:
             # fields vary slightly by API version; handle both
             url = it.get("url")
@@ -116,23 +232,70 @@ def _list_vercel_blobs_for_year(year: int):
             if not name or not allowed_media_file(name):
                 continue
             uploaded_at = it.get("uploadedAt") or it.get("createdAt")
-            results.append({"name": name, "url": url, "uploaded_at": uploaded_at})
-        return results
+            if isinstance(uploaded_at, (int, float)):
+                version = int(uploaded_at)
+            else:
+                version = _parse_iso8601(uploaded_at) or fetched_at
+            results.append(MediaItem(name, version, url))
+            if url:
+                index.setdefault(name, url)
+        _blob_list_cache[year] = (now, results, index)
+        return results, index
     except Exception:
-        return []
+        return [], {}
+
+
+def _blob_listing_is_fresh(year: int) -> bool:
+    cached = _blob_list_cache.get(year)
+    return bool(cached) and time.monotonic() - cached[0] < BLOB_LIST_TTL
+
+
+def _refresh_blob_listing_async(year: int):
+    """Refresh a year's listing on the pool unless it's fresh or already in flight."""
+    if not VERCEL_BLOB_READ_TOKEN or _blob_listing_is_fresh(year):
+        return
+    pending = _blob_refreshes.get(year)
+    if pending is None or pending.done():
+        _blob_refreshes[year] = _io_pool.submit(_fetch_blob_listing, year)
+
+
+def _prefetch_years():
+    """Warm every gallery year concurrently so the first visit hits the cache."""
+    for year in GALLERY_YEARS:
+        _refresh_blob_listing_async(year)
+
+
+def _list_vercel_blobs_for_year(year: int):
+    """Return the year's blobs as MediaItems, versioned by upload time."""
+    return _blob_listing(year)[0]
+
+
+def _blob_index_for_year(year: int):
+    """Return {name: url} for the year's blobs, for O(1) media lookups."""
+    return _blob_listing(year)[1]
+
+
+_prefetch_years()
+
+
+# The same handful of match dates repeat across a page, so memoize the output.
+@functools.lru_cache(maxsize=1024)
+def _format_day(day_ordinal: int, format: str) -> str:
+    return datetime.date.fromordinal(day_ordinal).strftime(format)
 
- 
 
 # Custom filter to format date as "DD MMM YYYY"
 @app.template_filter('format_date')
 def format_date(value, format='%d %b %Y'):
     try:
         # If value is already a date, use it; otherwise, parse from string.
+        if isinstance(value, datetime.datetime):
+            return value.strftime(format)
         if isinstance(value, datetime.date):
             dt = value
         else:
-            dt = datetime.datetime.strptime(value, '%Y-%m-%d').date()
-        return dt.strftime(format)
+            dt = datetime.date.fromisoformat(value)
+        return _format_day(dt.toordinal(), format)
     except Exception as e:
         return value
     
@@ -145,10 +308,24 @@ class PlayerInfo(db.Model):
     beer_duty_date = db.Column(db.Date, nullable=True)
     support_offered = db.Column(db.Text, nullable=True)  # New column for support notes
 
+    # game_day looks up the beer duty player by date
+    __table_args__ = (db.Index('ix_playerinfo_beer_duty_date', 'beer_duty_date'),)
+
     def __repr__(self):
         return f'<PlayerInfo {self.name}>'
 
 
+# Lineup slots picked on the edit form; "Away" is derived from whoever is left over.
+LINEUP_POSITIONS = (
+    "Striker", "Left Wing", "Right Wing", "Attacking Mid",
+    "Defensive Mid 1", "Defensive Mid 2", "Right Back", "Left Back",
+    "Centre Back 1", "Centre Back 2", "Goalkeeper",
+    "Sub 1", "Sub 2", "Sub 3", "Sub 4", "Sub 5",
+    "Beer Duty",
+)
+LINEUP_POSITIONS_WITH_AWAY = LINEUP_POSITIONS + ("Away",)
+
+
 # Define the Event model. All events are matches.
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -157,13 +334,14 @@ class Event(db.Model):
     field = db.Column(db.String(100), nullable=False)
     opponent = db.Column(db.String(100), nullable=True)
     type = db.Column(db.String(20), nullable=False, default='match')  # Always "match"
-    lineup = db.Column(MutableDict.as_mutable(db.JSON), nullable=False, default=lambda: {
+    # Plain JSON columns: in-place edits are not tracked, so always assign a new dict.
+    lineup = db.Column(db.JSON, nullable=False, default=lambda: {
         "Striker": "", "Left Wing": "", "Right Wing": "", "Attacking Mid": "",
         "Defensive Mid 1": "", "Defensive Mid 2": "", "Right Back": "", "Left Back": "",
         "Centre Back 1": "", "Centre Back 2": "", "Goalkeeper": "", "Away": "",
         "Sub 1": "", "Sub 2": "", "Sub 3": "", "Sub 4": "", "Beer Duty": ""
     })
-    result = db.Column(MutableDict.as_mutable(db.JSON), nullable=False, default=lambda: {
+    result = db.Column(db.JSON, nullable=False, default=lambda: {
         "home_score": "",
         "away_score": "",
         "goal_scorers": [],
@@ -171,15 +349,13 @@ class Event(db.Model):
         "cards": {"yellow": [], "red": []}
     })
 
+    # next-match and results queries filter on type and order by date
+    __table_args__ = (db.Index('ix_event_type_date', 'type', 'date'),)
+
     def __repr__(self):
         return f'<Event {self.id} on {self.date}>'
 
     
-# Create database tables if they don't exist
-with app.app_context():
-    db.create_all()
-
-
 # Simple timing helper so we can inspect latency in Vercel logs.
 def _log_duration(label: str, start_time: float) -> float:
     elapsed_ms = (time.perf_counter() - start_time) * 1000
@@ -188,9 +364,59 @@ def _log_duration(label: str, start_time: float) -> float:
 
 
  
-def _ensure_player_stat_rows(players):
-    """Batch ensure PlayerStat rows exist without per-player queries."""
-    existing_stats = PlayerStat.query.all()
+# Columns the stats tables may be sorted by (shared by the 2025 and season tables)
+_ALLOWED_STAT_FIELDS = frozenset({
+    'player', 'goals', 'assists', 'player_of_match', 'yellow_cards', 'red_cards',
+})
+
+
+def _player_stat_order(field, descending):
+    """ORDER BY clause for the 2025 table, letting the database do the sort."""
+    column = func.lower(PlayerStat.player) if field == 'player' else getattr(PlayerStat, field)
+    return column.desc() if descending else column.asc()
+
+
+def _season_stat_order(field, descending):
+    """ORDER BY clause for a season table; 'player' sorts on the joined name."""
+    column = func.lower(PlayerInfo.name) if field == 'player' else getattr(SeasonStat, field)
+    return column.desc() if descending else column.asc()
+
+
+def _player_stats_select(player_names, order_by):
+    # only hydrate the rows for the current squad, not every historical name
+    return (
+        select(PlayerStat)
+        .where(PlayerStat.player.in_(player_names))
+        .order_by(order_by)
+    )
+
+
+def _season_stats_select(player_ids, season_year: int, order_by):
+    # raiseload guards against lazy loads sneaking back in; the player is
+    # attached from the list we already hold instead of re-selected
+    return (
+        select(SeasonStat)
+        .join(SeasonStat.player)
+        .options(raiseload('*'))
+        .where(
+            SeasonStat.season_year == season_year,
+            SeasonStat.player_id.in_(player_ids),
+        )
+        .order_by(order_by)
+    )
+
+
+def _ensure_player_stat_rows(players, order_by):
+    """Batch ensure PlayerStat rows exist without per-player queries.
+
+    Existing rows come back in ``order_by`` order; newly created rows are
+    appended at the end.
+    """
+    if not players:
+        return {}, False
+
+    player_names = [player.name for player in players]
+    existing_stats = db.session.scalars(_player_stats_select(player_names, order_by)).all()
     stats_by_name = {stat.player: stat for stat in existing_stats}
 
     missing_stats = [
@@ -201,30 +427,32 @@ def _ensure_player_stat_rows(players):
     created = bool(missing_stats)
 
     if created:
-        # combined multiple per-player inserts into one batch write
+        # combined multiple per-player inserts into one batch write; they go
+        # out with the next autoflush or the route's commit
         db.session.add_all(missing_stats)
-        db.session.flush()
         for stat in missing_stats:
             stats_by_name[stat.player] = stat
 
     return stats_by_name, created
 
 
-def _ensure_season_stat_rows(players, season_year: int):
-    """Batch ensure SeasonStat rows exist per season."""
+def _ensure_season_stat_rows(players, season_year: int, order_by):
+    """Batch ensure SeasonStat rows exist per season.
+
+    Existing rows come back in ``order_by`` order; newly created rows are
+    appended at the end.
+    """
     if not players:
         return {}, False
 
-    player_ids = [player.id for player in players]
-    existing_stats = (
-        SeasonStat.query.options(selectinload(SeasonStat.player))
-        .filter(
-            SeasonStat.season_year == season_year,
-            SeasonStat.player_id.in_(player_ids),
-        )
-        .all()
-    )
-    stats_by_player_id = {stat.player_id: stat for stat in existing_stats}
+    players_by_id = {player.id: player for player in players}
+    existing_stats = db.session.scalars(
+        _season_stats_select(players_by_id, season_year, order_by)
+    ).all()
+    stats_by_player_id = {}
+    for stat in existing_stats:
+        set_committed_value(stat, 'player', players_by_id[stat.player_id])
+        stats_by_player_id[stat.player_id] = stat
 
     missing_stats = []
     for player in players:
@@ -236,27 +464,69 @@ def _ensure_season_stat_rows(players, season_year: int):
     created = bool(missing_stats)
 
     if created:
-        # avoid one insert per player by batching the new season rows
+        # avoid one insert per player by batching the new season rows; no
+        # flush here so the 2025 totals copied in later ride along in the INSERT
         db.session.add_all(missing_stats)
-        db.session.flush()
 
     return stats_by_player_id, created
 
 
-def _sort_player_stats(stats, field, descending):
-    if field == 'player':
-        key_fn = lambda stat: stat.player.lower()
-    else:
-        key_fn = lambda stat: getattr(stat, field, 0)
-    return sorted(stats, key=key_fn, reverse=descending)
+# Numbered field groups posted by the edit result form, e.g. "goal_scorer_3".
+_RESULT_FORM_PREFIXES = (
+    'goal_scorer', 'goal_count',
+    'assist_player', 'assist_count',
+    'yellow_card', 'red_card',
+)
+
+
+def _bucket_indexed_fields(form, prefixes):
+    """Group "<prefix>_<n>" form fields into {prefix: {n: value}} in one pass."""
+    buckets = {prefix: {} for prefix in prefixes}
+    for key, value in form.items():
+        prefix, _, index = key.rpartition('_')
+        bucket = buckets.get(prefix)
+        if bucket is not None and index.isdecimal():
+            bucket[int(index)] = value
+    return buckets
+
+
+def _indexed_up_to(bucket, count):
+    """Yield (n, value) for 1 <= n <= count in order; hidden rows past count are ignored."""
+    for index in sorted(bucket):
+        if index > count:
+            break
+        if index >= 1:
+            yield index, bucket[index]
+
+
+# Helper to load the squad list at most once per request. No caller reads
+# player.season_stats, so instead of eager-loading it for nothing we make any
+# future access fail loudly rather than quietly firing one SELECT per player.
+def get_players_cached():
+    if 'players' not in g:
+        g.players = (
+            PlayerInfo.query.options(raiseload(PlayerInfo.season_stats))
+            .order_by(PlayerInfo.name)
+            .all()
+        )
+    return g.players
 
 
-def _sort_season_stats(stats, field, descending):
-    if field == 'player':
-        key_fn = lambda stat: (stat.player.name.lower() if stat.player else '')
-    else:
-        key_fn = lambda stat: getattr(stat, field, 0)
-    return sorted(stats, key=key_fn, reverse=descending)
+# Events come back ordered by date, so consecutive runs share a year.
+def _group_events_by_year(events):
+    return {
+        year: list(year_events)
+        for year, year_events in itertools.groupby(events, key=lambda event: event.date.year)
+    }
+
+
+# Write straight to an event row without SELECTing it first; 404 if it's gone.
+def _update_event_or_404(event_id, **values):
+    updated = db.session.execute(
+        update(Event).where(Event.id == event_id).values(**values).returning(Event.id)
+    ).first()
+    if updated is None:
+        abort(404)
 
 
 # Helper function to get the next match event (today or later)
@@ -317,40 +587,53 @@ def players():
         return redirect(url_for('login'))
 
     if request.method == 'POST' and session.get('logged_in'):
-        for player in PlayerInfo.query.all():
-            # Store the old name before updating
-            old_name = player.name
-            new_name = request.form.get(f'name_{player.id}', player.name)
+        # Build every row up front so the whole form saves as one bulk
+        # UPDATE per table instead of an ORM flush per player.
+        player_rows = []
+        renamed = {}
+        for player_id, old_name in db.session.execute(select(PlayerInfo.id, PlayerInfo.name)):
+            new_name = request.form.get(f'name_{player_id}', old_name)
             if new_name != old_name:
-                # Update the corresponding PlayerStat record if it exists
-                player_stat = PlayerStat.query.filter_by(player=old_name).first()
-                if player_stat:
-                    player_stat.player = new_name
-            player.name = new_name
-
-            # Update other fields
-            player.preferred_position = request.form.get(f'preferred_position_{player.id}', '')
-            player.shirt_number = request.form.get(f'shirt_{player.id}', '')
-            
+                renamed[old_name] = new_name
+
             # Update beer duty date:
-            date_str = request.form.get(f'beer_duty_date_{player.id}', '')
+            date_str = request.form.get(f'beer_duty_date_{player_id}', '')
+            beer_duty_date = None
             if date_str:
                 try:
-                    player.beer_duty_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+                    beer_duty_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
                 except ValueError:
-                    player.beer_duty_date = None
-            else:
-                player.beer_duty_date = None
+                    pass
+
+            player_rows.append({
+                "id": player_id,
+                "name": new_name,
+                "preferred_position": request.form.get(f'preferred_position_{player_id}', ''),
+                "shirt_number": request.form.get(f'shirt_{player_id}', ''),
+                "beer_duty_date": beer_duty_date,
+                # Update support offered notes
+                "support_offered": request.form.get(f'support_offered_{player_id}', ''),
+            })
+
+        if player_rows:
+            db.session.execute(update(PlayerInfo), player_rows)
+        if renamed:
+            # Keep the name-keyed PlayerStat rows in step with renamed players
+            stat_rows = [
+                {"id": stat_id, "player": renamed[stat_player]}
+                for stat_id, stat_player in db.session.execute(
+                    select(PlayerStat.id, PlayerStat.player).where(PlayerStat.player.in_(renamed))
+                )
+            ]
+            if stat_rows:
+                db.session.execute(update(PlayerStat), stat_rows)
 
-            # Update support offered notes
-            player.support_offered = request.form.get(f'support_offered_{player.id}', '')
-            
         db.session.commit()
         flash("Player details updated.")
         return redirect(url_for('players'))
 
 
-    players = PlayerInfo.query.order_by(PlayerInfo.name).all()
+    players = get_players_cached()
     return render_template('players.html', players=players)
 
 
@@ -371,18 +654,25 @@ def add_player():
 def delete_player(player_id):
     if not session.get('logged_in'):
         return redirect(url_for('login'))
-    player = PlayerInfo.query.get_or_404(player_id)
-    player_name = player.name
-    db.session.delete(player)
-    
-    # Delete the corresponding PlayerStat record
-    player_stat = PlayerStat.query.filter_by(player=player_name).first()
-    if player_stat:
-        db.session.delete(player_stat)
-
-    # Delete any season stats linked to the player
-    SeasonStat.query.filter_by(player_id=player_id).delete()
-    
+    # Clear dependent rows with one DELETE each before the player row goes,
+    # so the FK is never violated. The player row is never SELECTed: its name
+    # is resolved inside the PlayerStat DELETE and handed back by RETURNING.
+    player_name_subquery = (
+        select(PlayerInfo.name).where(PlayerInfo.id == player_id).scalar_subquery()
+    )
+    db.session.execute(
+        delete(SeasonStat).where(SeasonStat.player_id == player_id),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.execute(
+        delete(PlayerStat).where(PlayerStat.player == player_name_subquery),
+        execution_options={"synchronize_session": False},
+    )
+    player_name = db.session.execute(
+        delete(PlayerInfo).where(PlayerInfo.id == player_id).returning(PlayerInfo.name)
+    ).scalar_one_or_none()
+    if player_name is None:
+        abort(404)
     db.session.commit()
 
     preferred_year_arg = request.args.get('stats_year')
@@ -416,13 +706,7 @@ def schedule():
             field=request.form.get('field'),
             opponent=request.form.get('opponent', ''),
             type='match',
-                lineup={pos: '' for pos in [
-                    "Striker", "Left Wing", "Right Wing", "Attacking Mid",
-                    "Defensive Mid 1", "Defensive Mid 2", "Right Back", "Left Back",
-                    "Centre Back 1", "Centre Back 2", "Goalkeeper",
-                    "Sub 1", "Sub 2", "Sub 3", "Sub 4", "Sub 5",
-                    "Away"
-                ]},
+            lineup=dict.fromkeys(LINEUP_POSITIONS_WITH_AWAY, ''),
             result={"home_score": "", "away_score": "", "goal_scorers": [], "cards": {"yellow": [], "red": []}}
         )
         db.session.add(new_event)
@@ -430,15 +714,7 @@ def schedule():
         flash("New event added successfully.")
         return redirect(url_for('schedule'))
     events = Event.query.order_by(Event.date.asc()).all()
-    events_by_year = {}
-    for event in events:
-        event_date = event.date
-        if not isinstance(event_date, datetime.date):
-            try:
-                event_date = datetime.datetime.strptime(str(event.date), '%Y-%m-%d').date()
-            except ValueError:
-                continue
-        events_by_year.setdefault(event_date.year, []).append(event)
+    events_by_year = _group_events_by_year(events)
     now = datetime.date.today()
     return render_template(
         "schedule.html",
@@ -457,7 +733,7 @@ def edit_schedule(event_id):
         return redirect(url_for('schedule'))
 
     event = Event.query.get_or_404(event_id)
-    players = PlayerInfo.query.order_by(PlayerInfo.name).all()  # Get players from DB
+    players = get_players_cached()
 
     if request.method == "POST":
         try:
@@ -474,13 +750,7 @@ def edit_schedule(event_id):
         new_lineup = {}
 
         # Handle all positions except "Away"
-        for pos in [
-            "Striker", "Left Wing", "Right Wing", "Attacking Mid",
-            "Defensive Mid 1", "Defensive Mid 2", "Right Back", "Left Back",
-            "Centre Back 1", "Centre Back 2", "Goalkeeper",
-            "Sub 1", "Sub 2", "Sub 3", "Sub 4", "Sub 5",
-            "Beer Duty"
-        ]:
+        for pos in LINEUP_POSITIONS:
             player = request.form.get(pos, '')
             new_lineup[pos] = player
             if player:
@@ -508,8 +778,11 @@ def delete_schedule(event_id):
     if not session.get('logged_in'):
         flash("Only admin can delete events.")
         return redirect(url_for('schedule'))
-    event = Event.query.get_or_404(event_id)
-    db.session.delete(event)
+    deleted = db.session.execute(
+        delete(Event).where(Event.id == event_id).returning(Event.id)
+    ).first()
+    if deleted is None:
+        abort(404)
     db.session.commit()
     flash("Event deleted successfully.")
     return redirect(url_for('schedule'))
@@ -521,15 +794,7 @@ def results():
     if not (session.get('logged_in') or session.get('guest')):
         return redirect(url_for('login'))
     match_events = Event.query.filter_by(type='match').order_by(Event.date.asc()).all()
-    events_by_year = {}
-    for event in match_events:
-        event_date = event.date
-        if not isinstance(event_date, datetime.date):
-            try:
-                event_date = datetime.datetime.strptime(str(event.date), '%Y-%m-%d').date()
-            except ValueError:
-                continue
-        events_by_year.setdefault(event_date.year, []).append(event)
+    events_by_year = _group_events_by_year(match_events)
     now = datetime.date.today()
     return render_template(
         "results.html",
@@ -543,65 +808,64 @@ def edit_result(event_id):
     if not (session.get('logged_in') or session.get('guest')):
         return redirect(url_for('login'))
 
-    event = Event.query.get_or_404(event_id)
-    if not event.result:
-        event.result = {
-            "home_score": "",
-            "away_score": "",
-            "goal_scorers": [],
-            "assists": [],            # ← ensure assists exists
-            "cards": {"yellow": [], "red": []}
-        }
-
     if request.method == "POST":
         new_result = {}
         new_result['home_score'] = request.form.get('home_score', '')
         new_result['away_score'] = request.form.get('away_score', '')
 
+        # Bucket the numbered "<prefix>_<n>" fields in one pass over the form
+        fields = _bucket_indexed_fields(request.form, _RESULT_FORM_PREFIXES)
+
         # Process goal scorers
         num_goal_scorers = int(request.form.get('num_goal_scorers', 0))
+        goal_counts = fields['goal_count']
         goal_scorers = []
-        for i in range(1, num_goal_scorers + 1):
-            player = request.form.get(f'goal_scorer_{i}', '')
-            goals  = request.form.get(f'goal_count_{i}', '')
+        for i, player in _indexed_up_to(fields['goal_scorer'], num_goal_scorers):
+            goals = goal_counts.get(i, '')
             if player and goals:
                 goal_scorers.append({'player': player, 'goals': int(goals)})
         new_result['goal_scorers'] = goal_scorers
 
         # Process assists
         num_assists = int(request.form.get('num_assists', 0))
+        assist_counts = fields['assist_count']
         assist_list = []
-        for i in range(1, num_assists + 1):
-            player = request.form.get(f'assist_player_{i}', '')
-            count  = request.form.get(f'assist_count_{i}', '')
+        for i, player in _indexed_up_to(fields['assist_player'], num_assists):
+            count = assist_counts.get(i, '')
             if player and count:
                 assist_list.append({'player': player, 'assists': int(count)})
         new_result['assists'] = assist_list
 
         # Process yellow cards
         num_yellow = int(request.form.get('num_yellow_cards', 0))
-        yellow_cards = []
-        for i in range(1, num_yellow + 1):
-            player = request.form.get(f'yellow_card_{i}', '')
-            if player:
-                yellow_cards.append(player)
+        yellow_cards = [
+            player for _, player in _indexed_up_to(fields['yellow_card'], num_yellow) if player
+        ]
 
         # Process red cards
         num_red = int(request.form.get('num_red_cards', 0))
-        red_cards = []
-        for i in range(1, num_red + 1):
-            player = request.form.get(f'red_card_{i}', '')
-            if player:
-                red_cards.append(player)
+        red_cards = [
+            player for _, player in _indexed_up_to(fields['red_card'], num_red) if player
+        ]
 
         new_result['cards'] = {"yellow": yellow_cards, "red": red_cards}
 
-        event.result = new_result
+        _update_event_or_404(event_id, result=new_result)
         db.session.commit()
         flash("Result updated successfully.")
         return redirect(url_for('results'))
 
-    players = PlayerInfo.query.order_by(PlayerInfo.name).all()
+    event = Event.query.get_or_404(event_id)
+    if not event.result:
+        event.result = {
+            "home_score": "",
+            "away_score": "",
+            "goal_scorers": [],
+            "assists": [],            # ← ensure assists exists
+            "cards": {"yellow": [], "red": []}
+        }
+
+    players = get_players_cached()
     return render_template("edit_result.html", event=event, players=players)
 
 
@@ -614,14 +878,13 @@ def delete_result(event_id):
         flash("Only admin can delete match results.")
         return redirect(url_for('results'))
 
-    event = Event.query.get_or_404(event_id)
-    event.result = {
+    _update_event_or_404(event_id, result={
         "home_score": "",
         "away_score": "",
         "goal_scorers": [],
         "assists": [],
         "cards": {"yellow": [], "red": []}
-    }
+    })
     db.session.commit()
     flash("Match result deleted.")
     return redirect(url_for('results'))
@@ -644,7 +907,7 @@ class PlayerStat(db.Model):
 
 class SeasonStat(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    player_id = db.Column(db.Integer, db.ForeignKey('player_info.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player_info.id', ondelete='CASCADE'), nullable=False)
     season_year = db.Column(db.Integer, nullable=False)
     goals = db.Column(db.Integer, default=0)
     assists = db.Column(db.Integer, default=0)
@@ -652,7 +915,11 @@ class SeasonStat(db.Model):
     yellow_cards = db.Column(db.Integer, default=0)
     red_cards = db.Column(db.Integer, default=0)
 
-    player = db.relationship('PlayerInfo', backref='season_stats', lazy=True)
+    player = db.relationship(
+        'PlayerInfo',
+        backref=db.backref('season_stats', passive_deletes=True),
+        lazy=True,
+    )
 
     __table_args__ = (db.UniqueConstraint('player_id', 'season_year', name='uq_player_season'),)
 
@@ -660,9 +927,23 @@ class SeasonStat(db.Model):
         return f'<SeasonStat {self.season_year} {self.player_id}>'
 
 
-# Make sure to create tables for new models as well
-with app.app_context():
+# Schema setup runs out-of-band (`flask --app app create-db`) so serverless
+# cold starts don't pay for metadata queries on every import. Set
+# RUN_CREATE_ALL=1 to keep the old create-on-import behaviour locally.
+@app.cli.command('create-db')
+def create_db_command():
+    """Create database tables and indexes if they don't exist."""
     db.create_all()
+    # create_all skips tables that already exist, so add any new indexes too
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    click.echo("Database tables created.")
+
+
+if os.environ.get('RUN_CREATE_ALL'):
+    with app.app_context():
+        db.create_all()
 
 # Stats route
 @app.route('/stats', methods=['GET', 'POST'])
@@ -673,29 +954,6 @@ def stats():
     route_start = time.perf_counter()
     db_section_start = time.perf_counter()
 
-    # Load all players once; hooks cache ensures we don't re-query inside loops.
-    all_players = PlayerInfo.query.order_by(PlayerInfo.name).all()
-    player_stats_by_name, created_player_rows = _ensure_player_stat_rows(all_players)
-    season_stats_by_player_id, created_season_rows = _ensure_season_stat_rows(all_players, 2026)
-    db_changed = created_player_rows or created_season_rows
-
-    player_stats = list(player_stats_by_name.values())
-    season_stats_2026 = list(season_stats_by_player_id.values())
-
-    # If 2026 season rows were just created, initialize them by copying 2025 totals
-    if created_season_rows:
-        for season_stat in season_stats_2026:
-            base_2025 = player_stats_by_name.get(season_stat.player.name)
-            if base_2025:
-                season_stat.goals = base_2025.goals
-                season_stat.assists = base_2025.assists
-                season_stat.player_of_match = base_2025.player_of_match
-                season_stat.yellow_cards = base_2025.yellow_cards
-                season_stat.red_cards = base_2025.red_cards
-        db_changed = True
-
-    _log_duration("stats.db_setup", db_section_start)
-
     preferred_year_arg = request.args.get('stats_year')
     try:
         preferred_year = int(preferred_year_arg) if preferred_year_arg else None
@@ -703,24 +961,56 @@ def stats():
         preferred_year = None
 
     # Sorting logic (2025 table)
-    allowed_fields = ['player', 'goals', 'assists', 'player_of_match', 'yellow_cards', 'red_cards']
     sort_field = request.args.get('sort', 'player')
-    if sort_field not in allowed_fields:
+    if sort_field not in _ALLOWED_STAT_FIELDS:
         sort_field = 'player'
     current_order = request.args.get('order', 'asc')
     next_order = 'desc' if current_order == 'asc' else 'asc'
-
-    player_stats = _sort_player_stats(player_stats, sort_field, current_order == 'desc')
+    player_order = _player_stat_order(sort_field, current_order == 'desc')
 
     # Sorting logic (2026 table)
-    season_allowed_fields = ['player', 'goals', 'assists', 'player_of_match', 'yellow_cards', 'red_cards']
     season_sort_field = request.args.get('season_sort', 'player')
-    if season_sort_field not in season_allowed_fields:
+    if season_sort_field not in _ALLOWED_STAT_FIELDS:
         season_sort_field = 'player'
     season_current_order = request.args.get('season_order', 'asc')
     season_next_order = 'desc' if season_current_order == 'asc' else 'asc'
+    season_order = _season_stat_order(season_sort_field, season_current_order == 'desc')
+
+    # Load all players once; hooks cache ensures we don't re-query inside loops.
+    all_players = get_players_cached()
+    player_stats_by_name, created_player_rows = _ensure_player_stat_rows(all_players, player_order)
+    season_stats_by_player_id, created_season_rows = _ensure_season_stat_rows(
+        all_players, 2026, season_order
+    )
+    db_changed = created_player_rows or created_season_rows
+
+    player_stats = list(player_stats_by_name.values())
+    season_stats_2026 = list(season_stats_by_player_id.values())
+
+    # If 2026 season rows were just created, initialize them by copying 2025 totals
+    if created_season_rows:
+        players_by_id = {player.id: player for player in all_players}
+        for season_stat in season_stats_2026:
+            base_2025 = player_stats_by_name.get(players_by_id[season_stat.player_id].name)
+            if base_2025:
+                season_stat.goals = base_2025.goals
+                season_stat.assists = base_2025.assists
+                season_stat.player_of_match = base_2025.player_of_match
+                season_stat.yellow_cards = base_2025.yellow_cards
+                season_stat.red_cards = base_2025.red_cards
+        db_changed = True
+
+    if db_changed:
+        # New rows and copied totals arrived after the ordered reads; re-read
+        # so the database places them. Only happens when the squad changes.
+        player_stats = db.session.scalars(
+            _player_stats_select(list(player_stats_by_name), player_order)
+        ).all()
+        season_stats_2026 = db.session.scalars(
+            _season_stats_select(list(season_stats_by_player_id), 2026, season_order)
+        ).all()
 
-    season_stats_2026 = _sort_season_stats(season_stats_2026, season_sort_field, season_current_order == 'desc')
+    _log_duration("stats.db_setup", db_section_start)
 
     # Update form (admin only)
     if request.method == 'POST' and session.get('logged_in'):
@@ -800,78 +1090,227 @@ def links():
 
 # ----------------- Gallery Routes -----------------
 
+def _gallery_etag(year, media_files):
+    state = (year, bool(session.get('logged_in')), [(m.name, m.v) for m in media_files])
+    return hashlib.sha1(repr(state).encode()).hexdigest()
+
+
+def _with_gallery_validators(response, etag, media_files):
+    """Stamp a gallery page response, 200 or 304, with the same cache headers."""
+    response.set_etag(etag)
+    response.last_modified = max((m.v for m in media_files), default=int(time.time()))
+    response.headers['Cache-Control'] = 'private, no-cache'  # always revalidate
+    return response
+
+
 @app.route('/gallery')
 def gallery():
     if not (session.get('logged_in') or session.get('guest')):
         return redirect(url_for('login'))
     # Default to 2025 tab
-    try:
-        year = int(request.args.get('year', 2025))
-    except (TypeError, ValueError):
-        year = 2025
-    year = 2025 if year not in (2025, 2026) else year
+    year = _parse_year(request.args)
 
     # Prefer Vercel Blob listing when configured; otherwise fall back to bundled files
     media_files = []
+    # warm the other tabs' listings (if stale) while this one is fetched
+    for other_year in GALLERY_YEARS - {year}:
+        _refresh_blob_listing_async(other_year)
     blob_items = _list_vercel_blobs_for_year(year)
     if blob_items:
-        for it in blob_items:
-            version = int(time.time())
-            try:
-                # uploaded_at may be ISO string; we only need a cache-busting int
-                if isinstance(it.get("uploaded_at"), (int, float)):
-                    version = int(it["uploaded_at"])
-            except Exception:
-                pass
-        # Build list suitable for templates; include 'url' directly
-        media_files = [{"name": it["name"], "v": version, "url": it.get("url")} for it in blob_items]
+        # already normalized (and versioned by upload time) when the listing was fetched
+        media_files = blob_items
     else:
-        year_dir = os.path.join(GALLERY_ROOT, str(year))
-        if os.path.isdir(year_dir):
-            for name in sorted(os.listdir(year_dir)):
-                if allowed_media_file(name):
-                    try:
-                        stat = os.stat(os.path.join(year_dir, name))
-                        version = int(stat.st_mtime)
-                    except OSError:
-                        version = int(time.time())
-                    media_files.append({"name": name, "v": version})
-
-    return render_template(
+        year_dir = GALLERY_YEAR_DIRS[year]
+        # one directory read; DirEntry caches type info and needs no path joins.
+        # Globals used per entry are bound to locals for the large-gallery case.
+        allowed, item, append = allowed_media_file, MediaItem, media_files.append
+        try:
+            with os.scandir(year_dir) as it:
+                entries = [e for e in it if e.is_file() and allowed(e.name)]
+        except OSError:
+            entries = []
+        entries.sort(key=lambda e: e.name)
+        now = int(time.time())
+        for entry in entries:
+            try:
+                version = int(entry.stat().st_mtime)
+            except OSError:
+                version = now
+            append(item(entry.name, version))
+
+    # Conditional GET: the page only changes with the listing or the viewer's
+    # role. The ETag covers names too, since a delete may not move the newest
+    # mtime. Pending flash messages always need a fresh render.
+    etag = _gallery_etag(year, media_files)
+    if '_flashes' not in session and etag in request.if_none_match:
+        return _with_gallery_validators(Response(status=304), etag, media_files)
+
+    response = make_response(render_template(
         "gallery.html",
         active_year=year,
         media_files=media_files
-    )
+    ))
+    return _with_gallery_validators(response, etag, media_files)
 
 
 @app.route('/gallery/media/<int:year>/<path:filename>')
 def gallery_media(year, filename):
-    if year not in (2025, 2026):
+    if year not in GALLERY_YEARS:
         abort(404)
     # If available on Vercel Blob, redirect to its public URL
-    blob_items = _list_vercel_blobs_for_year(year)
-    if blob_items:
-        for it in blob_items:
-            if it.get("name") == filename and it.get("url"):
-                return redirect(it["url"])
-    # Fallback to bundled files
-    directory = os.path.join(GALLERY_ROOT, str(year))
-    response = send_from_directory(directory, filename, max_age=0)
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
+    url = _blob_index_for_year(year).get(filename)
+    if url:
+        return redirect(url)
+    # Fallback to bundled files. The gallery links carry ?v=<mtime>, so a
+    # changed file gets a new URL and the old one can be cached for good.
+    directory = GALLERY_YEAR_DIRS[year]
+    response = send_from_directory(directory, filename, max_age=MEDIA_MAX_AGE, conditional=True)
+    response.headers['Cache-Control'] = f'public, max-age={MEDIA_MAX_AGE}, immutable'
     return response
 
 
+class GalleryRequest(Request):
+    """Spool gallery uploads straight into GALLERY_ROOT.
+
+    Werkzeug normally buffers large uploads in a temp file that ``save()``
+    then copies again; spooling next to the gallery lets the upload be
+    renamed into place so the bytes hit disk exactly once.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint == 'gallery_upload':
+            try:
+                spool = tempfile.NamedTemporaryFile(dir=GALLERY_ROOT, prefix='.upload-', delete=False)
+            except OSError:
+                pass  # read-only filesystem; keep Werkzeug's default spooling
+            else:
+                g.setdefault('upload_spools', []).append(spool.name)
+                return spool
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
+app.request_class = GalleryRequest
+
+
+@app.teardown_request
+def _remove_upload_spools(exc):
+    # anything not renamed into the gallery (rejected, failed) is discarded
+    for path in g.pop('upload_spools', ()):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _save_upload(file, save_path):
+    """Move an uploaded file to save_path, renaming its spool when possible."""
+    spool_path = getattr(file.stream, 'name', None)
+    if spool_path in g.get('upload_spools', ()):
+        file.stream.flush()
+        os.replace(spool_path, save_path)
+        os.chmod(save_path, 0o644)  # temp files are created 0600
+    else:
+        with open(save_path, 'wb') as dst:
+            shutil.copyfileobj(file.stream, dst, 1 << 20)
+
+
+_CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+)$')
+UPLOAD_BLOCK_SIZE = 1 << 20  # 1 MiB
+PARTIAL_UPLOAD_MAX_AGE = 24 * 3600  # seconds before an abandoned upload is swept
+
+
+def _expire_partial_uploads():
+    """Remove partial uploads nobody has added a chunk to for a day."""
+    cutoff = time.time() - PARTIAL_UPLOAD_MAX_AGE
+    try:
+        with os.scandir(GALLERY_ROOT) as it:
+            stale = [e.path for e in it
+                     if e.name.startswith('.partial-') and e.stat().st_mtime < cutoff]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _receive_upload_chunk():
+    """Append one ``Content-Range`` chunk to a resumable upload.
+
+    The raw request body is the chunk; ``year`` and ``name`` come from the
+    query string. Chunks must arrive in order: each one starts where the
+    partial file ends, otherwise the client gets a 416 carrying the size
+    received so far to resume from. The partial file is renamed into the
+    gallery once it holds all ``total`` bytes, so a dropped connection only
+    costs the chunk in flight.
+    """
+    year = _parse_year(request.args)
+
+    match = _CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+    # validate the name the file is actually saved under
+    safe_name = secure_filename(request.args.get('name', ''))
+    if not match or not safe_name or not allowed_media_file(safe_name):
+        abort(400)
+    start, end, total = map(int, match.groups())
+    if start > end or end >= total:
+        abort(400)
+
+    partial_path = os.path.join(GALLERY_ROOT, f'.partial-{year}-{safe_name}')
+    if start == 0:
+        _expire_partial_uploads()
+    # the first chunk starts a fresh file, dropping any abandoned attempt
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if start == 0 else 0)
+    try:
+        fd = os.open(partial_path, flags, 0o644)
+        try:
+            received = os.fstat(fd).st_size
+            if start != received:
+                return jsonify(error="Chunk does not continue the upload.",
+                               name=safe_name, received=received, total=total), 416
+            offset = start
+            while offset <= end:
+                block = request.stream.read(min(UPLOAD_BLOCK_SIZE, end + 1 - offset))
+                if not block:
+                    break
+                while block:
+                    written = os.pwrite(fd, block, offset)
+                    offset += written
+                    block = block[written:]
+            if offset != end + 1:
+                # body shorter than the advertised range: drop what arrived
+                # so the chunk can be resent from ``start``
+                os.ftruncate(fd, start)
+        finally:
+            os.close(fd)
+        if offset != end + 1:
+            if start == 0:
+                os.remove(partial_path)
+            abort(400)
+
+        complete = offset == total
+        if complete:
+            save_dir = GALLERY_YEAR_DIRS[year]
+            os.makedirs(save_dir, exist_ok=True)
+            os.replace(partial_path, os.path.join(save_dir, safe_name))
+            _invalidate_blob_listing(year)
+    except OSError:
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        return jsonify(error="Failed to save file (filesystem not writable)."), 500
+    return jsonify(name=safe_name, received=offset, total=total, complete=complete)
+
+
 @app.route('/gallery/upload', methods=['POST'])
 def gallery_upload():
     if not session.get('logged_in'):
         flash("Only admin can upload media.")
         return redirect(url_for('gallery'))
-    try:
-        year = int(request.form.get('year', 2025))
-    except (TypeError, ValueError):
-        year = 2025
-    year = 2025 if year not in (2025, 2026) else year
+    if 'Content-Range' in request.headers:
+        return _receive_upload_chunk()
+    year = _parse_year(request.form)
 
     if 'file' not in request.files:
         flash("No file part in the request.")
@@ -882,7 +1321,7 @@ def gallery_upload():
         return redirect(url_for('gallery', year=year))
     if file and allowed_media_file(file.filename):
         safe_name = secure_filename(file.filename)
-        save_dir = os.path.join(GALLERY_ROOT, str(year))
+        save_dir = GALLERY_YEAR_DIRS[year]
         try:
             os.makedirs(save_dir, exist_ok=True)
         except OSError:
@@ -890,11 +1329,12 @@ def gallery_upload():
             return redirect(url_for('gallery', year=year))
         try:
             save_path = os.path.join(save_dir, safe_name)
-            file.save(save_path)
+            _save_upload(file, save_path)
         except Exception:
             flash("Failed to save file (filesystem not writable).")
             return redirect(url_for('gallery', year=year))
         else:
+            _invalidate_blob_listing(year)
             flash("Upload successful.")
             return redirect(url_for('gallery', year=year))
     else:
@@ -906,32 +1346,33 @@ def gallery_delete():
     if not session.get('logged_in'):
         flash("Only admin can delete media.")
         return redirect(url_for('gallery'))
-    try:
-        year = int(request.form.get('year', 2025))
-    except (TypeError, ValueError):
-        year = 2025
-    year = 2025 if year not in (2025, 2026) else year
+    year = _parse_year(request.form)
 
     filename = request.form.get('name', '')
     if not filename or not allowed_media_file(filename):
         flash("Invalid file.")
         return redirect(url_for('gallery', year=year))
-    # Only delete within the intended directory
-    target_dir = os.path.join(GALLERY_ROOT, str(year))
-    target_path = os.path.join(target_dir, filename)
-    if not os.path.abspath(target_path).startswith(os.path.abspath(target_dir)):
+    # Only delete within the intended directory: uploads are stored under
+    # their secure_filename, so anything else (separators, "..") is rejected
+    # before touching the filesystem.
+    if secure_filename(filename) != filename:
         flash("Invalid path.")
         return redirect(url_for('gallery', year=year))
+    target_path = os.path.join(GALLERY_YEAR_DIRS[year], filename)
     try:
-        if os.path.exists(target_path):
-            os.remove(target_path)
-            flash("Media deleted.")
-        else:
-            flash("File not found.")
+        os.remove(target_path)
+        _invalidate_blob_listing(year)
+        flash("Media deleted.")
+    except FileNotFoundError:
+        flash("File not found.")
     except OSError:
         flash("Could not delete file.")
     return redirect(url_for('gallery', year=year))
 
 
+# Local development server only. For load testing, run a real WSGI server, e.g.:
+#   gunicorn -w $(nproc) -k gthread --threads 8 app:app
 if __name__ == '__main__':
-    app.run(debug=True)
+    debug = bool(os.environ.get('FLASK_DEBUG'))
+    # never expose the Werkzeug debugger console beyond this machine
+    app.run(host='127.0.0.1' if debug else '0.0.0.0', threaded=True, debug=debug)